@@ -1,11 +1,14 @@
 import os
-import pymongo
+import asyncio
+import aiohttp
+from pymongo import AsyncMongoClient
+from pymongo.write_concern import WriteConcern
 import pandas as pd
-import requests
 from dotenv import load_dotenv
 from datetime import datetime
 import json
 import random
+import ijson
 
 # Load environment variables
 load_dotenv()
@@ -18,201 +21,261 @@ MONGO_DB_NAME = "AkkuProject"
 # SAMPLE SIZE CONFIGURATION
 SAMPLE_SIZE = 2500  # Number of records to store from each dataset
 
-# Connect to MongoDB
-print("Connecting to MongoDB...")
-client = pymongo.MongoClient(MONGO_CONNECTION_STRING)
-db = client[MONGO_DB_NAME]
-
-# Test connection
-try:
-    client.admin.command('ping')
-    print("✓ Successfully connected to MongoDB!")
-    print(f"✓ Using database: {MONGO_DB_NAME}")
-except Exception as e:
-    print(f"✗ Connection failed: {e}")
-    exit()
-
 # Collection names
 EV_RAW_COLLECTION = "ev_data_raw"
 NUTRITION_RAW_COLLECTION = "nutrition_data_raw"
+# Dataset metadata lives in its own collection so the raw collections hold
+# only records and can be read without a filter
+EV_META_COLLECTION = "ev_data_meta"
+NUTRITION_META_COLLECTION = "nutrition_data_meta"
 
-print("\n" + "="*60)
-print("DATASET 1: Electric Vehicle Population Data (JSON)")
-print("="*60)
-
-# Dataset 1: Electric Vehicle Population Data (Semi-structured JSON)
-print("\nFetching Electric Vehicle data from API...")
+# API endpoints
 EV_API_URL = "https://data.wa.gov/api/views/f6w7-q2d2/rows.json?accessType=DOWNLOAD"
+# Directly request only 2500 records from API
+NUTRITION_API_URL = f"https://chronicdata.cdc.gov/resource/hn4x-zwk7.json?$limit={SAMPLE_SIZE}"
+
+# Both datasets are processed concurrently, so their progress lines are
+# tagged with the dataset they belong to
+EV_TAG = "[EV]"
+NUTRITION_TAG = "[Nutrition]"
+
+# Insert in unordered batches of 100, all sent concurrently
+INSERT_BATCH_SIZE = 100
+
+async def bulk_insert(collection, documents, batch_size=INSERT_BATCH_SIZE):
+    # gather() re-raises the first failed batch, if any
+    await asyncio.gather(*(
+        collection.insert_many(documents[i:i + batch_size], ordered=False,
+                               bypass_document_validation=True)
+        for i in range(0, len(documents), batch_size)))
+
+
+async def process_ev(session, db):
+    # Dataset 1: Electric Vehicle Population Data (Semi-structured JSON)
+    print(f"{EV_TAG} Fetching Electric Vehicle data from API...")
+
+    try:
+        # Parse the JSON while it downloads instead of buffering the whole body.
+        # 'meta' comes before 'data' in the rows.json layout, so the column
+        # parser is only fed until the columns are found, while the row
+        # parser sees the whole stream.
+        found_columns = ijson.sendable_list()
+        parsed_rows = ijson.sendable_list()
+        columns_parser = ijson.items_coro(found_columns, "meta.view.columns", use_float=True)
+        rows_parser = ijson.items_coro(parsed_rows, "data.item", use_float=True)
+        columns_meta = None
+        response_size = 0
+
+        # SAMPLE: Reservoir-sample 2500 records while parsing (Algorithm R),
+        # so only SAMPLE_SIZE rows are ever held in memory
+        sampled_rows = []
+        total_records = 0
+
+        def sample_parsed_rows():
+            nonlocal total_records
+            for row in parsed_rows:
+                total_records += 1
+                if total_records <= SAMPLE_SIZE:
+                    sampled_rows.append(row)
+                else:
+                    j = random.randrange(total_records)
+                    if j < SAMPLE_SIZE:
+                        sampled_rows[j] = row
+            del parsed_rows[:]
 
-try:
-    response = requests.get(EV_API_URL, timeout=120)
-    response.raise_for_status()
-    ev_json_data = response.json()
-    
-    print(f"✓ Downloaded EV data successfully")
-    print(f"  - Response size: {len(response.content) / (1024*1024):.2f} MB")
-    
-    # Store raw JSON in MongoDB
-    collection_ev_raw = db[EV_RAW_COLLECTION]
-    
-    # Clear existing data
-    collection_ev_raw.delete_many({})
-    print("✓ Cleared existing EV data")
-    
-    # Extract column names from metadata
-    columns_meta = ev_json_data.get("meta", {}).get("view", {}).get("columns", [])
-    column_names = [col.get("name", f"col_{i}") for i, col in enumerate(columns_meta)]
-    
-    print(f"  - Columns found: {len(column_names)}")
-    print(f"  - Total records available: {len(ev_json_data.get('data', [])):,}")
-    
-    # Store metadata separately
-    metadata_doc = {
-        "dataset_name": "Electric Vehicle Population Data",
-        "source": "Washington State Department of Licensing",
-        "format": "JSON (Semi-structured)",
-        "sdg_goals": ["Goal 7: Clean Energy", "Goal 11: Sustainable Cities", "Goal 13: Climate Action"],
-        "downloaded_at": datetime.now(),
-        "api_url": EV_API_URL,
-        "columns": column_names,
-        "column_metadata": columns_meta,
-        "total_available_records": len(ev_json_data.get("data", [])),
-        "sampled_records": SAMPLE_SIZE,
-        "sampling_method": "random",
-        "is_metadata": True
-    }
-    collection_ev_raw.insert_one(metadata_doc)
-    print("✓ Stored metadata document")
-    
-    # SAMPLE: Take random 2500 records instead of all
-    ev_data_rows = ev_json_data.get("data", [])
-    
-    if len(ev_data_rows) > SAMPLE_SIZE:
-        sampled_rows = random.sample(ev_data_rows, SAMPLE_SIZE)
-        print(f"\n✓ Randomly sampled {SAMPLE_SIZE:,} records from {len(ev_data_rows):,} total records")
-    else:
-        sampled_rows = ev_data_rows
-        print(f"\n✓ Using all {len(ev_data_rows):,} records (less than sample size)")
-    
-    # Convert to documents
-    ev_documents = []
-    for row in sampled_rows:
-        doc = {
+        async with session.get(EV_API_URL) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                response_size += len(chunk)
+                if columns_meta is None:
+                    columns_parser.send(chunk)
+                    if found_columns:
+                        columns_meta = found_columns[0]
+                rows_parser.send(chunk)
+                sample_parsed_rows()
+        rows_parser.close()
+        sample_parsed_rows()
+        columns_meta = columns_meta or []
+
+        print(f"{EV_TAG} ✓ Downloaded EV data successfully")
+        print(f"{EV_TAG}   - Response size: {response_size / (1024*1024):.2f} MB")
+
+        # Store raw JSON in MongoDB
+        # w=1: raw data is re-fetchable, so favour insert throughput
+        collection_ev_raw = db.get_collection(EV_RAW_COLLECTION, write_concern=WriteConcern(w=1))
+
+        # Clear existing data
+        await collection_ev_raw.delete_many({})
+        print(f"{EV_TAG} ✓ Cleared existing EV data")
+
+        # Extract column names from metadata
+        column_names = [col.get("name", f"col_{i}") for i, col in enumerate(columns_meta)]
+
+        print(f"{EV_TAG}   - Columns found: {len(column_names)}")
+        print(f"{EV_TAG}   - Total records available: {total_records:,}")
+
+        # Store metadata separately
+        metadata_doc = {
+            "dataset_name": "Electric Vehicle Population Data",
+            "source": "Washington State Department of Licensing",
+            "format": "JSON (Semi-structured)",
+            "sdg_goals": ["Goal 7: Clean Energy", "Goal 11: Sustainable Cities", "Goal 13: Climate Action"],
+            "downloaded_at": datetime.now(),
+            "api_url": EV_API_URL,
+            "columns": column_names,
+            "column_metadata": columns_meta,
+            "total_available_records": total_records,
+            "sampled_records": SAMPLE_SIZE,
+            "sampling_method": "random"
+        }
+        await db[EV_META_COLLECTION].replace_one({}, metadata_doc, upsert=True)
+        print(f"{EV_TAG} ✓ Stored metadata document in '{EV_META_COLLECTION}'")
+
+        if total_records > SAMPLE_SIZE:
+            print(f"{EV_TAG} ✓ Randomly sampled {SAMPLE_SIZE:,} records from {total_records:,} total records")
+        else:
+            print(f"{EV_TAG} ✓ Using all {total_records:,} records (less than sample size)")
+
+        # Convert to documents, mapping row values to column names
+        ev_import_meta = {
             "_imported_at": datetime.now(),
             "_dataset_name": "Electric Vehicle Population Data",
             "_source": "Washington State DOL"
         }
-        
-        # Map data to column names
-        for idx, value in enumerate(row):
-            if idx < len(column_names):
-                doc[column_names[idx]] = value
-        
-        ev_documents.append(doc)
-    
-    # Insert all at once (faster for small datasets)
-    print(f"\nInserting {len(ev_documents):,} EV records...")
-    collection_ev_raw.insert_many(ev_documents)
-    
-    print(f"✓ Stored in MongoDB collection: '{EV_RAW_COLLECTION}'")
-    print(f"  - Total records inserted: {len(ev_documents):,}")
-    
-except requests.exceptions.RequestException as e:
-    print(f"✗ Error downloading EV data: {e}")
-except Exception as e:
-    print(f"✗ Error processing EV data: {e}")
-    import traceback
-    traceback.print_exc()
-
-print("\n" + "="*60)
-print("DATASET 2: Nutrition, Physical Activity, and Obesity Data")
-print("="*60)
-
-# Dataset 2: Nutrition, Physical Activity, and Obesity
-print("\nFetching Nutrition data from CDC API (limited to 2500 records)...")
-# Directly request only 2500 records from API
-NUTRITION_API_URL = f"https://chronicdata.cdc.gov/resource/hn4x-zwk7.json?$limit={SAMPLE_SIZE}"
+        ev_documents = [{**ev_import_meta, **dict(zip(column_names, row))} for row in sampled_rows]
+
+        # Insert in unordered batches
+        print(f"{EV_TAG} Inserting {len(ev_documents):,} EV records...")
+        await bulk_insert(collection_ev_raw, ev_documents)
+
+        print(f"{EV_TAG} ✓ Stored in MongoDB collection: '{EV_RAW_COLLECTION}'")
+        print(f"{EV_TAG}   - Total records inserted: {len(ev_documents):,}")
+
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"{EV_TAG} ✗ Error downloading EV data: {e}")
+    except Exception as e:
+        print(f"{EV_TAG} ✗ Error processing EV data: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+async def process_nutrition(session, db):
+    # Dataset 2: Nutrition, Physical Activity, and Obesity
+    print(f"{NUTRITION_TAG} Fetching Nutrition data from CDC API (limited to 2500 records)...")
+
+    try:
+        async with session.get(NUTRITION_API_URL) as response:
+            response.raise_for_status()
+            body = await response.read()
+        nutrition_json_data = json.loads(body)
+
+        print(f"{NUTRITION_TAG} ✓ Downloaded Nutrition data successfully")
+        print(f"{NUTRITION_TAG}   - Response size: {len(body) / (1024*1024):.2f} MB")
+        print(f"{NUTRITION_TAG}   - Total records fetched: {len(nutrition_json_data):,}")
+
+        # Store raw JSON in MongoDB
+        collection_nutrition_raw = db.get_collection(NUTRITION_RAW_COLLECTION, write_concern=WriteConcern(w=1))
+
+        # Clear existing data
+        await collection_nutrition_raw.delete_many({})
+        print(f"{NUTRITION_TAG} ✓ Cleared existing Nutrition data")
+
+        # Add metadata to each document
+        nutrition_import_meta = {
+            '_imported_at': datetime.now(),
+            '_dataset_name': "Nutrition, Physical Activity, and Obesity - BRFSS",
+            '_source': "CDC - Behavioral Risk Factor Surveillance System"
+        }
+        nutrition_documents = [{**record, **nutrition_import_meta} for record in nutrition_json_data]
+
+        # Insert in unordered batches
+        print(f"{NUTRITION_TAG} Inserting {len(nutrition_documents):,} Nutrition records...")
+        await bulk_insert(collection_nutrition_raw, nutrition_documents)
+
+        # Store metadata document
+        metadata_doc = {
+            "dataset_name": "Nutrition, Physical Activity, and Obesity - BRFSS",
+            "source": "CDC Behavioral Risk Factor Surveillance System",
+            "format": "JSON API (Structured)",
+            "sdg_goals": ["Goal 2: Zero Hunger", "Goal 3: Good Health and Well-being"],
+            "downloaded_at": datetime.now(),
+            "api_url": NUTRITION_API_URL,
+            "sampled_records": len(nutrition_json_data),
+            "sampling_method": "API limit parameter"
+        }
+        await db[NUTRITION_META_COLLECTION].replace_one({}, metadata_doc, upsert=True)
+
+        print(f"{NUTRITION_TAG} ✓ Stored in MongoDB collection: '{NUTRITION_RAW_COLLECTION}'")
+        print(f"{NUTRITION_TAG}   - Total records inserted: {len(nutrition_documents):,}")
+
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"{NUTRITION_TAG} ✗ Error downloading Nutrition data: {e}")
+    except Exception as e:
+        print(f"{NUTRITION_TAG} ✗ Error processing Nutrition data: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+async def main():
+    # Connect to MongoDB
+    print("Connecting to MongoDB...")
+    # Compress traffic to/from the server
+    client = AsyncMongoClient(MONGO_CONNECTION_STRING, compressors='zstd,zlib',
+                              zlibCompressionLevel=6, maxPoolSize=32)
+    db = client[MONGO_DB_NAME]
+
+    # Test connection
+    try:
+        await client.admin.command('ping')
+        print("✓ Successfully connected to MongoDB!")
+        print(f"✓ Using database: {MONGO_DB_NAME}")
+    except Exception as e:
+        print(f"✗ Connection failed: {e}")
+        exit()
+
+    print("\n" + "="*60)
+    print("FETCHING DATASETS (concurrently)")
+    print("="*60)
+    print(f"{EV_TAG} Dataset 1: Electric Vehicle Population Data (JSON)")
+    print(f"{NUTRITION_TAG} Dataset 2: Nutrition, Physical Activity, and Obesity Data\n")
+
+    # Run both dataset pipelines at the same time. Like requests' timeout=120,
+    # the limit applies to connecting and to each read, not the whole download
+    http_timeout = aiohttp.ClientTimeout(total=None, sock_connect=120, sock_read=120)
+    async with aiohttp.ClientSession(timeout=http_timeout) as session:
+        await asyncio.gather(process_ev(session, db), process_nutrition(session, db))
+
+    print("\n" + "="*60)
+    print("DATA INGESTION SUMMARY")
+    print("="*60)
+
+    # Display collections in database
+    collections = await db.list_collection_names()
+    print(f"\n✓ Database: {MONGO_DB_NAME}")
+    print(f"✓ Collections created: {len(collections)}")
+    for col in collections:
+        count = await db[col].estimated_document_count()
+        # Get sample document to show structure
+        sample = await db[col].find_one()
+        print(f"\n  📁 Collection: {col}")
+        print(f"     - Total documents: {count:,}")
+        if sample:
+            print(f"     - Sample fields: {list(sample.keys())[:10]}...")
+
+    print("\n" + "="*60)
+    print("✓ DATA INGESTION COMPLETE!")
+    print("="*60)
+    print(f"\n📊 Total records stored: {SAMPLE_SIZE * 2:,} records")
+    print(f"💾 Storage saved: Using only {SAMPLE_SIZE:,} records per dataset")
+    print(f"⏱️  Time saved: Much faster downloads and inserts!")
+    print("\nNext steps:")
+    print("1. Run data cleaning and transformation")
+    print("2. Perform exploratory data analysis")
+    print("3. Create visualizations")
+
+    # Close connection
+    await client.close()
+    print("\n✓ MongoDB connection closed.")
+
 
-try:
-    response = requests.get(NUTRITION_API_URL, timeout=120)
-    response.raise_for_status()
-    nutrition_json_data = response.json()
-    
-    print(f"✓ Downloaded Nutrition data successfully")
-    print(f"  - Response size: {len(response.content) / (1024*1024):.2f} MB")
-    print(f"  - Total records fetched: {len(nutrition_json_data):,}")
-    
-    # Store raw JSON in MongoDB
-    collection_nutrition_raw = db[NUTRITION_RAW_COLLECTION]
-    
-    # Clear existing data
-    collection_nutrition_raw.delete_many({})
-    print("✓ Cleared existing Nutrition data")
-    
-    # Add metadata to each document
-    nutrition_documents = []
-    for record in nutrition_json_data:
-        record['_imported_at'] = datetime.now()
-        record['_dataset_name'] = "Nutrition, Physical Activity, and Obesity - BRFSS"
-        record['_source'] = "CDC - Behavioral Risk Factor Surveillance System"
-        nutrition_documents.append(record)
-    
-    # Insert all at once
-    print(f"\nInserting {len(nutrition_documents):,} Nutrition records...")
-    collection_nutrition_raw.insert_many(nutrition_documents)
-    
-    # Store metadata document
-    metadata_doc = {
-        "dataset_name": "Nutrition, Physical Activity, and Obesity - BRFSS",
-        "source": "CDC Behavioral Risk Factor Surveillance System",
-        "format": "JSON API (Structured)",
-        "sdg_goals": ["Goal 2: Zero Hunger", "Goal 3: Good Health and Well-being"],
-        "downloaded_at": datetime.now(),
-        "api_url": NUTRITION_API_URL,
-        "sampled_records": len(nutrition_json_data),
-        "sampling_method": "API limit parameter",
-        "is_metadata": True
-    }
-    collection_nutrition_raw.insert_one(metadata_doc)
-    
-    print(f"✓ Stored in MongoDB collection: '{NUTRITION_RAW_COLLECTION}'")
-    print(f"  - Total records inserted: {len(nutrition_documents):,}")
-    
-except requests.exceptions.RequestException as e:
-    print(f"✗ Error downloading Nutrition data: {e}")
-except Exception as e:
-    print(f"✗ Error processing Nutrition data: {e}")
-    import traceback
-    traceback.print_exc()
-
-print("\n" + "="*60)
-print("DATA INGESTION SUMMARY")
-print("="*60)
-
-# Display collections in database
-collections = db.list_collection_names()
-print(f"\n✓ Database: {MONGO_DB_NAME}")
-print(f"✓ Collections created: {len(collections)}")
-for col in collections:
-    count = db[col].count_documents({})
-    # Get sample document to show structure
-    sample = db[col].find_one({"is_metadata": {"$ne": True}})
-    print(f"\n  📁 Collection: {col}")
-    print(f"     - Total documents: {count:,}")
-    if sample:
-        print(f"     - Sample fields: {list(sample.keys())[:10]}...")
-
-print("\n" + "="*60)
-print("✓ DATA INGESTION COMPLETE!")
-print("="*60)
-print(f"\n📊 Total records stored: {SAMPLE_SIZE * 2:,} records")
-print(f"💾 Storage saved: Using only {SAMPLE_SIZE:,} records per dataset")
-print(f"⏱️  Time saved: Much faster downloads and inserts!")
-print("\nNext steps:")
-print("1. Run data cleaning and transformation")
-print("2. Perform exploratory data analysis")
-print("3. Create visualizations")
-
-# Close connection
-client.close()
-print("\n✓ MongoDB connection closed.")
+asyncio.run(main())
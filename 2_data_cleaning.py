@@ -2,7 +2,10 @@ import os
 import pymongo
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Load environment variables
@@ -13,9 +16,66 @@ MONGO_PASSWORD = os.getenv('MONGO_PASSWORD')
 MONGO_CONNECTION_STRING = os.getenv('MONGO_CONNECTION_STRING').replace('<db_password>', MONGO_PASSWORD)
 MONGO_DB_NAME = "AkkuProject"
 
+# Insert in unordered batches of 100 from a thread pool
+INSERT_BATCH_SIZE = 100
+INSERT_WORKERS = 16
+
+def insert_dataframe(collection, df, batch_size=INSERT_BATCH_SIZE):
+    # Each worker converts only its own slice of rows to documents, so the
+    # whole frame is never held as one big list of dicts
+    def insert_batch(start):
+        batch = df.iloc[start:start + batch_size].to_dict('records')
+        collection.insert_many(batch, ordered=False, bypass_document_validation=True)
+
+    with ThreadPoolExecutor(max_workers=INSERT_WORKERS) as executor:
+        # list() re-raises the first failed batch, if any
+        list(executor.map(insert_batch, range(0, len(df), batch_size)))
+
+# Text columns with fewer unique values than this share of rows are stored
+# as 'category' (dictionary-encoded) instead of one Python string per row
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+def convert_to_category(df):
+    converted = []
+    for col in df.select_dtypes(include='object').columns:
+        try:
+            unique_ratio = df[col].nunique(dropna=False) / max(len(df), 1)
+        except TypeError:
+            # Nested documents (e.g. geolocation) are unhashable
+            continue
+        if unique_ratio < CATEGORY_MAX_UNIQUE_RATIO:
+            df[col] = df[col].astype('category')
+            converted.append(col)
+    return converted
+
+# Object columns holding nested documents (e.g. geolocation). Their missing
+# values are stored as None: an 'Unknown' string among the dicts is a mixed
+# column that Parquet/Arrow cannot store
+def nested_columns(df):
+    # A column's first non-null value tells whether it holds documents
+    nested = []
+    for col in df.select_dtypes(include='object').columns:
+        first = df[col].first_valid_index()
+        if first is not None and isinstance(df[col].at[first], (dict, list)):
+            nested.append(col)
+    return nested
+
+# pyarrow's multi-threaded CSV writer is much faster than DataFrame.to_csv,
+# but only handles flat columns: nested values (e.g. geolocation) are written
+# as their text form, as to_csv does. They are converted before the Arrow
+# table is built, since a column mixing dicts and strings cannot be converted
+def write_csv(df, path, nested_cols):
+    flat_df = df.copy(deep=False)
+    for col in nested_cols:
+        flat_df[col] = df[col].map(lambda v: str(v) if isinstance(v, (dict, list)) else v)
+    table = pa.Table.from_pandas(flat_df, preserve_index=False)
+    pacsv.write_csv(table, path)
+
 # Connect to MongoDB
 print("Connecting to MongoDB...")
-client = pymongo.MongoClient(MONGO_CONNECTION_STRING)
+# Compressed connection (zstd, or zlib if the server lacks it)
+client = pymongo.MongoClient(MONGO_CONNECTION_STRING, compressors='zstd,zlib',
+                             zlibCompressionLevel=6, maxPoolSize=32)
 db = client[MONGO_DB_NAME]
 
 try:
@@ -41,8 +101,10 @@ print("="*60)
 # Load EV data from MongoDB
 print("\n1. Loading EV data from MongoDB...")
 ev_collection = db["ev_data_raw"]
-ev_cursor = ev_collection.find({"is_metadata": {"$ne": True}})
-ev_df = pd.DataFrame(list(ev_cursor))
+# Import bookkeeping fields are dropped during cleaning, so never fetch them
+import_fields_projection = {"_imported_at": 0, "_dataset_name": 0, "_source": 0}
+ev_cursor = ev_collection.find({}, projection=import_fields_projection).batch_size(1000)
+ev_df = pd.DataFrame.from_records(ev_cursor)
 
 print(f"✓ Loaded {len(ev_df):,} records")
 print(f"  - Columns: {len(ev_df.columns)}")
@@ -55,16 +117,15 @@ print(f"  - Memory usage: {ev_df.memory_usage(deep=True).sum() / 1024**2:.2f} MB
 # Check for missing values
 print("\n3. Missing Values Analysis:")
 missing_counts = ev_df.isnull().sum()
-missing_percent = (missing_counts / len(ev_df) * 100).round(2)
-missing_df = pd.DataFrame({
-    'Column': missing_counts.index,
-    'Missing_Count': missing_counts.values,
-    'Missing_Percent': missing_percent.values
-})
-missing_df = missing_df[missing_df['Missing_Count'] > 0].sort_values('Missing_Count', ascending=False)
-if len(missing_df) > 0:
-    print(f"  - Columns with missing values: {len(missing_df)}")
-    print(missing_df.head(10).to_string(index=False))
+missing_counts = missing_counts[missing_counts > 0].sort_values(ascending=False)
+if len(missing_counts) > 0:
+    print(f"  - Columns with missing values: {len(missing_counts)}")
+    top_missing = missing_counts.head(10)
+    print(pd.DataFrame({
+        'Column': top_missing.index,
+        'Missing_Count': top_missing.values,
+        'Missing_Percent': (top_missing.values / len(ev_df) * 100).round(2)
+    }).to_string(index=False))
 else:
     print("  - No missing values found!")
 
@@ -83,40 +144,52 @@ print(f"  ✓ Working with {len(actual_columns)} columns")
 
 # Convert numeric columns
 print("\n5. Data Type Conversions:")
-numeric_conversions = 0
-for col in ev_df_clean.columns:
-    # Try to convert to numeric if possible
+
+def to_numeric_if_possible(series):
+    # Convert an object column only when every non-null value parses as a
+    # number (the behaviour of the deprecated errors='ignore')
+    # All-null columns stay object so they are filled with 'Unknown' below
+    if series.dtype != 'object' or not series.notna().any():
+        return series
     try:
-        # Check if column might be numeric
-        sample_val = ev_df_clean[col].dropna().iloc[0] if len(ev_df_clean[col].dropna()) > 0 else None
-        if sample_val and isinstance(sample_val, (int, float, str)):
-            if str(sample_val).replace('.', '').replace('-', '').isdigit():
-                ev_df_clean[col] = pd.to_numeric(ev_df_clean[col], errors='coerce')
-                numeric_conversions += 1
-    except:
-        pass
+        return pd.to_numeric(series)
+    except (TypeError, ValueError):
+        return series
+
+original_dtypes = ev_df_clean.dtypes
+ev_df_clean = ev_df_clean.apply(to_numeric_if_possible)
+numeric_conversions = (ev_df_clean.dtypes != original_dtypes).sum()
 
 print(f"  ✓ Converted {numeric_conversions} columns to numeric types")
 
 # Fill missing values with appropriate defaults
 print("\n6. Handling Missing Values:")
-for col in ev_df_clean.columns:
-    missing_count = ev_df_clean[col].isnull().sum()
-    if missing_count > 0:
-        if ev_df_clean[col].dtype in ['float64', 'int64']:
-            # Fill numeric with median
-            ev_df_clean[col].fillna(ev_df_clean[col].median(), inplace=True)
-        else:
-            # Fill categorical with 'Unknown'
-            ev_df_clean[col].fillna('Unknown', inplace=True)
-
-print(f"  ✓ Filled all missing values")
+# Fill numeric with median
+numeric_part = ev_df_clean.select_dtypes(include=np.number)
+ev_df_clean[numeric_part.columns] = numeric_part.fillna(numeric_part.median())
+# Fill categorical with 'Unknown'; nested columns get a real null (None)
+# instead of the NaN from_records leaves for absent fields
+ev_nested_cols = nested_columns(ev_df_clean)
+object_part = ev_df_clean.select_dtypes(include='object').drop(columns=ev_nested_cols)
+ev_df_clean[object_part.columns] = object_part.fillna('Unknown')
+for col in ev_nested_cols:
+    ev_df_clean[col] = ev_df_clean[col].astype(object).where(ev_df_clean[col].notna(), None)
+
+if ev_nested_cols:
+    print(f"  ✓ Filled missing values (nested columns left null: {ev_nested_cols})")
+else:
+    print(f"  ✓ Filled all missing values")
 print(f"  ✓ Remaining missing values: {ev_df_clean.isnull().sum().sum()}")
 
+# Categories are assigned after filling so 'Unknown' is one of them
+category_cols = convert_to_category(ev_df_clean)
+print(f"  ✓ Stored {len(category_cols)} low-cardinality text columns as category")
+print(f"  ✓ Memory usage: {ev_df_clean.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+
 # Add derived columns
 print("\n7. Feature Engineering:")
 ev_df_clean['_processed_at'] = datetime.now()
-ev_df_clean['_record_id'] = range(1, len(ev_df_clean) + 1)
+ev_df_clean['_record_id'] = np.arange(1, len(ev_df_clean) + 1, dtype=np.int32)
 print(f"  ✓ Added processed timestamp and record IDs")
 
 # Store cleaned data
@@ -124,11 +197,9 @@ print("\n8. Storing Cleaned Data to MongoDB:")
 ev_clean_collection = db["ev_data_cleaned"]
 ev_clean_collection.delete_many({})
 
-# Convert DataFrame to dict for MongoDB
-ev_clean_records = ev_df_clean.to_dict('records')
-ev_clean_collection.insert_many(ev_clean_records)
+insert_dataframe(ev_clean_collection, ev_df_clean)
 
-print(f"  ✓ Stored {len(ev_clean_records):,} cleaned records")
+print(f"  ✓ Stored {len(ev_df_clean):,} cleaned records")
 print(f"  ✓ Collection: 'ev_data_cleaned'")
 
 # ============================================================
@@ -142,8 +213,8 @@ print("="*60)
 # Load Nutrition data from MongoDB
 print("\n1. Loading Nutrition data from MongoDB...")
 nutrition_collection = db["nutrition_data_raw"]
-nutrition_cursor = nutrition_collection.find({"is_metadata": {"$ne": True}})
-nutrition_df = pd.DataFrame(list(nutrition_cursor))
+nutrition_cursor = nutrition_collection.find({}, projection=import_fields_projection).batch_size(1000)
+nutrition_df = pd.DataFrame.from_records(nutrition_cursor)
 
 print(f"✓ Loaded {len(nutrition_df):,} records")
 print(f"  - Columns: {len(nutrition_df.columns)}")
@@ -156,16 +227,15 @@ print(f"  - Memory usage: {nutrition_df.memory_usage(deep=True).sum() / 1024**2:
 # Check for missing values
 print("\n3. Missing Values Analysis:")
 missing_counts = nutrition_df.isnull().sum()
-missing_percent = (missing_counts / len(nutrition_df) * 100).round(2)
-missing_df = pd.DataFrame({
-    'Column': missing_counts.index,
-    'Missing_Count': missing_counts.values,
-    'Missing_Percent': missing_percent.values
-})
-missing_df = missing_df[missing_df['Missing_Count'] > 0].sort_values('Missing_Count', ascending=False)
-if len(missing_df) > 0:
-    print(f"  - Columns with missing values: {len(missing_df)}")
-    print(missing_df.head(10).to_string(index=False))
+missing_counts = missing_counts[missing_counts > 0].sort_values(ascending=False)
+if len(missing_counts) > 0:
+    print(f"  - Columns with missing values: {len(missing_counts)}")
+    top_missing = missing_counts.head(10)
+    print(pd.DataFrame({
+        'Column': top_missing.index,
+        'Missing_Count': top_missing.values,
+        'Missing_Percent': (top_missing.values / len(nutrition_df) * 100).round(2)
+    }).to_string(index=False))
 else:
     print("  - No missing values found!")
 
@@ -201,26 +271,37 @@ print("\n6. Handling Missing Values:")
 initial_missing = nutrition_df_clean.isnull().sum().sum()
 print(f"  - Initial missing values: {initial_missing:,}")
 
-for col in nutrition_df_clean.columns:
-    missing_count = nutrition_df_clean[col].isnull().sum()
-    if missing_count > 0:
-        if nutrition_df_clean[col].dtype in ['float64', 'int64']:
-            # Fill numeric with median
-            nutrition_df_clean[col].fillna(nutrition_df_clean[col].median(), inplace=True)
-        else:
-            # Fill categorical with 'Unknown'
-            nutrition_df_clean[col].fillna('Unknown', inplace=True)
+# Fill numeric with median
+numeric_part = nutrition_df_clean.select_dtypes(include=np.number)
+nutrition_df_clean[numeric_part.columns] = numeric_part.fillna(numeric_part.median())
+# Fill categorical with 'Unknown'; nested columns (geolocation) get None
+nutrition_nested_cols = nested_columns(nutrition_df_clean)
+object_part = nutrition_df_clean.select_dtypes(include='object').drop(columns=nutrition_nested_cols)
+nutrition_df_clean[object_part.columns] = object_part.fillna('Unknown')
+for col in nutrition_nested_cols:
+    nutrition_df_clean[col] = nutrition_df_clean[col].astype(object).where(nutrition_df_clean[col].notna(), None)
 
 final_missing = nutrition_df_clean.isnull().sum().sum()
-print(f"  ✓ Filled missing values")
+if nutrition_nested_cols:
+    print(f"  ✓ Filled missing values (nested columns left null: {nutrition_nested_cols})")
+else:
+    print(f"  ✓ Filled all missing values")
 print(f"  - Remaining missing values: {final_missing}")
 
+# Covers locationdesc, class, topic and the stratification columns
+category_cols = convert_to_category(nutrition_df_clean)
+print(f"  ✓ Stored {len(category_cols)} low-cardinality text columns as category")
+print(f"  ✓ Memory usage: {nutrition_df_clean.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+
 # Feature Engineering
 print("\n7. Feature Engineering:")
 
 # Add year range column
 if 'yearstart' in nutrition_df_clean.columns and 'yearend' in nutrition_df_clean.columns:
-    nutrition_df_clean['year_range'] = nutrition_df_clean['yearstart'].astype(str) + '-' + nutrition_df_clean['yearend'].astype(str)
+    # Only a handful of distinct ranges exist, so store them as a category
+    year_starts = nutrition_df_clean['yearstart'].to_numpy(dtype='int32')
+    year_ends = nutrition_df_clean['yearend'].to_numpy(dtype='int32')
+    nutrition_df_clean['year_range'] = pd.Categorical([f"{start}-{end}" for start, end in zip(year_starts, year_ends)])
     print(f"  ✓ Created 'year_range' column")
 
 # Add confidence interval width
@@ -230,7 +311,7 @@ if 'low_confidence_limit' in nutrition_df_clean.columns and 'high_confidence_lim
 
 # Add processed timestamp
 nutrition_df_clean['_processed_at'] = datetime.now()
-nutrition_df_clean['_record_id'] = range(1, len(nutrition_df_clean) + 1)
+nutrition_df_clean['_record_id'] = np.arange(1, len(nutrition_df_clean) + 1, dtype=np.int32)
 print(f"  ✓ Added processed timestamp and record IDs")
 
 # Store cleaned data
@@ -238,11 +319,9 @@ print("\n8. Storing Cleaned Data to MongoDB:")
 nutrition_clean_collection = db["nutrition_data_cleaned"]
 nutrition_clean_collection.delete_many({})
 
-# Convert DataFrame to dict for MongoDB
-nutrition_clean_records = nutrition_df_clean.to_dict('records')
-nutrition_clean_collection.insert_many(nutrition_clean_records)
+insert_dataframe(nutrition_clean_collection, nutrition_df_clean)
 
-print(f"  ✓ Stored {len(nutrition_clean_records):,} cleaned records")
+print(f"  ✓ Stored {len(nutrition_df_clean):,} cleaned records")
 print(f"  ✓ Collection: 'nutrition_data_cleaned'")
 
 # ============================================================
@@ -258,7 +337,7 @@ print(f"\n✓ Database: {MONGO_DB_NAME}")
 print(f"✓ Total Collections: {len(collections)}\n")
 
 for col in collections:
-    count = db[col].count_documents({})
+    count = db[col].estimated_document_count()
     print(f"  📁 {col}")
     print(f"     - Documents: {count:,}")
 
@@ -270,9 +349,16 @@ print("\n📊 Cleaned Datasets Summary:")
 print(f"  - EV Data: {len(ev_df_clean):,} records, {len(ev_df_clean.columns)} columns")
 print(f"  - Nutrition Data: {len(nutrition_df_clean):,} records, {len(nutrition_df_clean.columns)} columns")
 
+# Parquet keeps the cleaned dtypes (numeric, category) for the analysis scripts
+print("\n💾 Exporting to Parquet for analysis...")
+ev_df_clean.to_parquet('ev_data_cleaned.parquet', engine='pyarrow', compression='zstd', index=False)
+nutrition_df_clean.to_parquet('nutrition_data_cleaned.parquet', engine='pyarrow', compression='zstd', index=False)
+print("  ✓ Exported: ev_data_cleaned.parquet")
+print("  ✓ Exported: nutrition_data_cleaned.parquet")
+
 print("\n💾 Exporting to CSV for backup...")
-ev_df_clean.to_csv('ev_data_cleaned.csv', index=False)
-nutrition_df_clean.to_csv('nutrition_data_cleaned.csv', index=False)
+write_csv(ev_df_clean, 'ev_data_cleaned.csv', ev_nested_cols)
+write_csv(nutrition_df_clean, 'nutrition_data_cleaned.csv', nutrition_nested_cols)
 print("  ✓ Exported: ev_data_cleaned.csv")
 print("  ✓ Exported: nutrition_data_cleaned.csv")
 
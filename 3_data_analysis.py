@@ -1,10 +1,9 @@
 import os
-import pymongo
 import pandas as pd
+import pyarrow.parquet as pq
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from dotenv import load_dotenv
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -12,26 +11,6 @@ warnings.filterwarnings('ignore')
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 
-# Load environment variables
-load_dotenv()
-
-# MongoDB Configuration
-MONGO_PASSWORD = os.getenv('MONGO_PASSWORD')
-MONGO_CONNECTION_STRING = os.getenv('MONGO_CONNECTION_STRING').replace('<db_password>', MONGO_PASSWORD)
-MONGO_DB_NAME = "AkkuProject"
-
-# Connect to MongoDB
-print("Connecting to MongoDB...")
-client = pymongo.MongoClient(MONGO_CONNECTION_STRING)
-db = client[MONGO_DB_NAME]
-
-try:
-    client.admin.command('ping')
-    print("✓ Connected to MongoDB!\n")
-except Exception as e:
-    print(f"✗ Connection failed: {e}")
-    exit()
-
 print("="*60)
 print("EXPLORATORY DATA ANALYSIS")
 print("="*60)
@@ -50,10 +29,9 @@ print("="*60)
 print("DATASET 1: Electric Vehicle Population Analysis")
 print("="*60)
 
-# Load cleaned EV data
-print("\n1. Loading EV data from MongoDB...")
-ev_collection = db["ev_data_cleaned"]
-ev_df = pd.DataFrame(list(ev_collection.find()))
+# Load cleaned EV data (Parquet keeps the dtypes set during cleaning)
+print("\n1. Loading EV data from Parquet...")
+ev_df = pd.read_parquet('ev_data_cleaned.parquet')
 
 print(f"✓ Loaded {len(ev_df):,} records")
 
@@ -69,7 +47,7 @@ col_info = pd.DataFrame({
     'Column': ev_df.columns,
     'Type': ev_df.dtypes.values,
     'Non-Null': ev_df.count().values,
-    'Unique': [ev_df[col].nunique() for col in ev_df.columns]
+    'Unique': ev_df.nunique().values
 })
 print(col_info.to_string(index=False))
 
@@ -94,7 +72,7 @@ else:
     print("\n5. No numeric columns found for statistical analysis")
 
 # Categorical Analysis
-categorical_cols = ev_df.select_dtypes(include=['object']).columns.tolist()
+categorical_cols = ev_df.select_dtypes(include=['object', 'category']).columns.tolist()
 categorical_cols = [col for col in categorical_cols if not col.startswith('_') and col != '_id']
 
 if len(categorical_cols) > 0:
@@ -118,9 +96,15 @@ print("DATASET 2: Nutrition & Obesity Analysis")
 print("="*60)
 
 # Load cleaned Nutrition data
-print("\n1. Loading Nutrition data from MongoDB...")
-nutrition_collection = db["nutrition_data_cleaned"]
-nutrition_df = pd.DataFrame(list(nutrition_collection.find()))
+print("\n1. Loading Nutrition data from Parquet...")
+# Only read the columns analysed below
+nutrition_columns = ['locationdesc', 'yearstart', 'class', 'topic', 'data_value',
+                     'low_confidence_limit', 'high_confidence_limit', 'sample_size',
+                     'confidence_interval_width']
+# Skip derived columns that cleaning did not create
+nutrition_file_columns = set(pq.read_schema('nutrition_data_cleaned.parquet').names)
+nutrition_columns = [col for col in nutrition_columns if col in nutrition_file_columns]
+nutrition_df = pd.read_parquet('nutrition_data_cleaned.parquet', columns=nutrition_columns)
 
 print(f"✓ Loaded {len(nutrition_df):,} records")
 
@@ -142,9 +126,10 @@ if 'locationdesc' in nutrition_df.columns:
         print(f"    {state}: {count:,} records")
 
 if 'yearstart' in nutrition_df.columns:
-    years = nutrition_df['yearstart'].dropna().unique()
-    print(f"\n  - Years covered: {sorted(years)}")
-    print(f"  - Year range: {min(years):.0f} - {max(years):.0f}")
+    # Sort once; the range is then just the first and last year
+    years = sorted(nutrition_df['yearstart'].dropna().unique())
+    print(f"\n  - Years covered: {years}")
+    print(f"  - Year range: {years[0]:.0f} - {years[-1]:.0f}")
 
 if 'class' in nutrition_df.columns:
     classes = nutrition_df['class'].nunique()
@@ -202,7 +187,8 @@ if 'yearstart' in nutrition_df.columns and 'data_value' in nutrition_df.columns:
     print("\nAnalyzing health trends over time...")
     
     # Calculate yearly averages
-    yearly_avg = nutrition_df.groupby('yearstart')['data_value'].agg(['mean', 'count']).reset_index()
+    yearly_avg = (nutrition_df.groupby('yearstart', sort=False, observed=True)['data_value']
+                  .agg(['mean', 'count']).reset_index().sort_values('yearstart'))
     
     print("\nYearly Statistics:")
     print(yearly_avg.to_string(index=False))
@@ -231,7 +217,7 @@ print("\n📊 Analysis Complete!")
 print(f"\n✓ EV Dataset:")
 print(f"  - Records analyzed: {len(ev_df):,}")
 print(f"  - Numeric columns: {len([col for col in ev_df.select_dtypes(include=[np.number]).columns if not col.startswith('_')])}")
-print(f"  - Categorical columns: {len([col for col in ev_df.select_dtypes(include=['object']).columns if not col.startswith('_')])}")
+print(f"  - Categorical columns: {len([col for col in ev_df.select_dtypes(include=['object', 'category']).columns if not col.startswith('_')])}")
 
 print(f"\n✓ Nutrition Dataset:")
 print(f"  - Records analyzed: {len(nutrition_df):,}")
@@ -244,6 +230,3 @@ print("\n" + "="*60)
 print("Next step: Run '4_visualizations.py' for detailed charts!")
 print("="*60)
 
-# Close connection
-client.close()
-print("\n✓ MongoDB connection closed.")
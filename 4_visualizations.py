@@ -1,10 +1,14 @@
 import os
-import pymongo
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
+import pyarrow.parquet as pq
 import numpy as np
+import matplotlib
+# Charts are only written to disk, so use the non-interactive raster backend
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
-from dotenv import load_dotenv
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -12,25 +16,157 @@ warnings.filterwarnings('ignore')
 sns.set_style("whitegrid")
 sns.set_palette("husl")
 
-# Load environment variables
-load_dotenv()
+# Charts are reviewed on screen and embedded in the report, where 150 dpi is
+# plenty; PNG encoding cost grows with the pixel count
+DPI = 150
+# The scatter plot is visually saturated well before this many points
+SCATTER_MAX_POINTS = 20000
+
+# ============================================================
+# PLOTTING FUNCTIONS
+# ============================================================
+
+# Each figure is drawn by its own function from small precomputed inputs, so
+# the figures can be rendered in worker processes; each returns the saved path
+
+# One Figure is cleared and resized for every chart instead of building a new
+# Figure/canvas/renderer each time (forked workers each get their own copy)
+FIG = plt.figure()
+
+def new_axes(width, height, ncols=1):
+    FIG.clf()
+    FIG.set_size_inches(width, height)
+    return FIG.subplots(1, ncols)
+
+
+def save_figure(path):
+    FIG.tight_layout()
+    FIG.savefig(path, dpi=DPI)
+    return path
+
+
+def plot_ev_distribution(col, value_counts):
+    ax = new_axes(14, 8)
+    value_counts.plot(kind='barh', ax=ax, color='steelblue')
+    ax.set_xlabel('Count', fontsize=12)
+    ax.set_ylabel(col, fontsize=12)
+    ax.set_title(f'Electric Vehicle Distribution by {col}', 
+                 fontsize=14, fontweight='bold', pad=20)
+    
+    # Add value labels
+    ax.bar_label(ax.containers[0], labels=[f'{v:,}' for v in value_counts.values],
+                 padding=3, fontsize=10)
+    
+    return save_figure(f'visualizations/ev_distribution_{col.replace(" ", "_")}.png')
+
+
+def plot_health_by_state(state_avg):
+    ax = new_axes(14, 8)
+    state_avg.plot(kind='barh', ax=ax, color='coral')
+    ax.set_xlabel('Average Data Value', fontsize=12)
+    ax.set_ylabel('State', fontsize=12)
+    ax.set_title('Average Health Indicators by State (Top 20)', 
+                 fontsize=14, fontweight='bold', pad=20)
+    
+    # Add value labels
+    ax.bar_label(ax.containers[0], labels=[f'{v:.1f}' for v in state_avg.values],
+                 padding=3, fontsize=9)
+    
+    return save_figure('visualizations/health_by_state.png')
+
+
+def plot_health_categories(class_counts):
+    # Pie and bar chart side by side in one figure
+    ax_pie, ax_bar = new_axes(20, 8, ncols=2)
+    colors = sns.color_palette("husl", len(class_counts))
+    ax_pie.pie(class_counts.values, labels=class_counts.index, autopct='%1.1f%%',
+               startangle=90, colors=colors, textprops={'fontsize': 10})
+    ax_pie.set_title('Distribution of Health Categories', fontsize=14, fontweight='bold', pad=20)
+    
+    class_counts.plot(kind='bar', ax=ax_bar, color='mediumseagreen')
+    ax_bar.set_xlabel('Health Category', fontsize=12)
+    ax_bar.set_ylabel('Number of Records', fontsize=12)
+    ax_bar.set_title('Health Categories - Record Count', fontsize=14, fontweight='bold', pad=20)
+    plt.setp(ax_bar.get_xticklabels(), rotation=45, ha='right')
+    
+    # Add value labels
+    ax_bar.bar_label(ax_bar.containers[0], labels=[f'{v:,}' for v in class_counts.values],
+                     padding=3, fontsize=10)
+    
+    return save_figure('visualizations/health_categories.png')
+
+
+def plot_health_trends(yearly_data):
+    ax = new_axes(14, 6)
+    ax.plot(yearly_data['year'], yearly_data['mean'], marker='o', 
+            linewidth=2.5, markersize=8, label='Mean', color='steelblue')
+    ax.plot(yearly_data['year'], yearly_data['median'], marker='s', 
+            linewidth=2.5, markersize=8, label='Median', color='coral')
+    
+    # Add confidence interval
+    ax.fill_between(yearly_data['year'], 
+                    yearly_data['mean'] - yearly_data['std'],
+                    yearly_data['mean'] + yearly_data['std'],
+                    alpha=0.2, color='steelblue', label='±1 Std Dev')
+    
+    ax.set_xlabel('Year', fontsize=12)
+    ax.set_ylabel('Health Indicator Value', fontsize=12)
+    ax.set_title('Health Indicators Trends Over Time', fontsize=14, fontweight='bold', pad=20)
+    ax.legend(fontsize=11)
+    ax.grid(True, alpha=0.3)
+    return save_figure('visualizations/health_trends_time_series.png')
 
-# MongoDB Configuration
-MONGO_PASSWORD = os.getenv('MONGO_PASSWORD')
-MONGO_CONNECTION_STRING = os.getenv('MONGO_CONNECTION_STRING').replace('<db_password>', MONGO_PASSWORD)
-MONGO_DB_NAME = "AkkuProject"
 
-# Connect to MongoDB
-print("Connecting to MongoDB...")
-client = pymongo.MongoClient(MONGO_CONNECTION_STRING)
-db = client[MONGO_DB_NAME]
+def plot_category_trends(category_lines):
+    ax = new_axes(14, 8)
+    for category, cat_data in category_lines.items():
+        ax.plot(cat_data['yearstart'], cat_data['data_value'], 
+                marker='o', linewidth=2, markersize=6, label=category)
+    
+    ax.set_xlabel('Year', fontsize=12)
+    ax.set_ylabel('Average Value', fontsize=12)
+    ax.set_title('Health Trends by Category Over Time', fontsize=14, fontweight='bold', pad=20)
+    ax.legend(fontsize=10, loc='best')
+    ax.grid(True, alpha=0.3)
+    return save_figure('visualizations/health_trends_by_category.png')
+
+
+def plot_value_distributions(hist_counts, hist_edges, box_data, box_labels):
+    axes = new_axes(16, 6, ncols=2)
+    
+    # Histogram, drawn from the precomputed bin counts
+    axes[0].bar(hist_edges[:-1], hist_counts, width=np.diff(hist_edges), align='edge',
+                color='steelblue', edgecolor='black', alpha=0.7)
+    axes[0].set_xlabel('Data Value', fontsize=12)
+    axes[0].set_ylabel('Frequency', fontsize=12)
+    axes[0].set_title('Distribution of Health Indicator Values', 
+                     fontsize=13, fontweight='bold')
+    axes[0].grid(True, alpha=0.3)
+    
+    # Box plot by class
+    if box_data is not None:
+        axes[1].boxplot(box_data, tick_labels=box_labels)
+        axes[1].set_xlabel('Health Category', fontsize=12)
+        axes[1].set_ylabel('Data Value', fontsize=12)
+        axes[1].set_title('Value Distribution by Category', 
+                         fontsize=13, fontweight='bold')
+        plt.setp(axes[1].get_xticklabels(), rotation=45, ha='right')
+    
+    return save_figure('visualizations/data_value_distributions.png')
+
+
+def plot_sample_size_vs_value(sample_sizes, values):
+    ax = new_axes(12, 6)
+    # Rasterize the points into a single image instead of one path per marker
+    ax.scatter(sample_sizes, values, 
+               alpha=0.5, s=30, color='mediumseagreen', rasterized=True)
+    ax.set_xlabel('Sample Size', fontsize=12)
+    ax.set_ylabel('Data Value', fontsize=12)
+    ax.set_title('Relationship between Sample Size and Data Value', 
+                 fontsize=14, fontweight='bold', pad=20)
+    ax.grid(True, alpha=0.3)
+    return save_figure('visualizations/sample_size_vs_value.png')
 
-try:
-    client.admin.command('ping')
-    print("✓ Connected to MongoDB!\n")
-except Exception as e:
-    print(f"✗ Connection failed: {e}")
-    exit()
 
 print("="*60)
 print("DATA VISUALIZATIONS")
@@ -46,232 +182,208 @@ print("✓ Created 'visualizations' directory\n")
 # ============================================================
 
 print("Loading datasets...")
-ev_df = pd.DataFrame(list(db["ev_data_cleaned"].find()))
-nutrition_df = pd.DataFrame(list(db["nutrition_data_cleaned"].find()))
+# Only read the nutrition columns that are plotted below
+nutrition_columns = ['locationdesc', 'yearstart', 'class', 'data_value', 'sample_size']
+ev_df = pd.read_parquet('ev_data_cleaned.parquet')
+# Only request columns present in the file
+nutrition_file_columns = set(pq.read_schema('nutrition_data_cleaned.parquet').names)
+nutrition_columns = [col for col in nutrition_columns if col in nutrition_file_columns]
+nutrition_df = pd.read_parquet('nutrition_data_cleaned.parquet', columns=nutrition_columns)
 print(f"✓ EV Data: {len(ev_df):,} records")
 print(f"✓ Nutrition Data: {len(nutrition_df):,} records\n")
 
+# Column checks for all nutrition charts, resolved once
+nutrition_cols = frozenset(nutrition_df.columns)
+has_data_value = 'data_value' in nutrition_cols
+has_class = 'class' in nutrition_cols
+has_year = 'yearstart' in nutrition_cols
+has_location = 'locationdesc' in nutrition_cols
+has_sample_size = 'sample_size' in nutrition_cols
+
+# Compact dtypes for the plotted columns: integer years, float32 values and
+# categorical grouping keys, so groupby/value_counts/isin work on integer codes
+# (the keys are usually already categorical from the cleaning step)
+nutrition_dtypes = {'yearstart': 'int32', 'data_value': 'float32', 'sample_size': 'float32',
+                    'class': 'category', 'locationdesc': 'category'}
+nutrition_df = nutrition_df.astype({col: dtype for col, dtype in nutrition_dtypes.items()
+                                    if col in nutrition_cols})
+
+# Rows with a data value, shared by every chart built from data_value so the
+# null mask is computed once
+if has_data_value:
+    nutrition_valid = nutrition_df.dropna(subset=['data_value'])
+else:
+    nutrition_valid = nutrition_df
+
+# Figures to render, as (plot function, arguments) pairs
+plot_jobs = []
+
 # ============================================================
 # VISUALIZATION 1: EV DATA ANALYSIS
 # ============================================================
 
 print("="*60)
-print("Creating EV Visualizations...")
+print("Preparing EV Visualizations...")
 print("="*60)
 
 # Find categorical columns for EV data
-ev_categorical = [col for col in ev_df.select_dtypes(include=['object']).columns 
+ev_categorical = [col for col in ev_df.select_dtypes(include=['object', 'category']).columns 
                   if not col.startswith('_') and col != '_id']
 
 if len(ev_categorical) > 0:
     # Take first categorical column with reasonable unique values
-    for col in ev_categorical:
-        if 5 <= ev_df[col].nunique() <= 50:
-            print(f"\n1. Distribution by {col}:")
-            
-            plt.figure(figsize=(14, 8))
-            value_counts = ev_df[col].value_counts().head(15)
-            
-            ax = value_counts.plot(kind='barh', color='steelblue')
-            plt.xlabel('Count', fontsize=12)
-            plt.ylabel(col, fontsize=12)
-            plt.title(f'Electric Vehicle Distribution by {col}', 
-                     fontsize=14, fontweight='bold', pad=20)
-            
-            # Add value labels
-            for i, v in enumerate(value_counts.values):
-                ax.text(v + max(value_counts.values)*0.01, i, f'{v:,}', 
-                       va='center', fontsize=10)
-            
-            plt.tight_layout()
-            plt.savefig(f'visualizations/ev_distribution_{col.replace(" ", "_")}.png', 
-                       dpi=300, bbox_inches='tight')
-            print(f"  ✓ Saved: visualizations/ev_distribution_{col.replace(' ', '_')}.png")
-            plt.close()
-            break
+    ev_unique_counts = ev_df[ev_categorical].nunique()
+    candidate_cols = ev_unique_counts[(ev_unique_counts >= 5) & (ev_unique_counts <= 50)].index
+    if len(candidate_cols) > 0:
+        col = candidate_cols[0]
+        print(f"\n1. Distribution by {col}")
+        
+        value_counts = ev_df[col].value_counts().head(15)
+        plot_jobs.append((plot_ev_distribution, (col, value_counts)))
 
 # ============================================================
 # VISUALIZATION 2: NUTRITION DATA - GEOGRAPHIC ANALYSIS
 # ============================================================
 
 print("\n" + "="*60)
-print("Creating Nutrition Visualizations...")
+print("Preparing Nutrition Visualizations...")
 print("="*60)
 
-if 'locationdesc' in nutrition_df.columns and 'data_value' in nutrition_df.columns:
-    print("\n2. Health Indicators by State (Top 20):")
-    
-    state_avg = nutrition_df.groupby('locationdesc')['data_value'].mean().sort_values(ascending=False).head(20)
-    
-    plt.figure(figsize=(14, 8))
-    ax = state_avg.plot(kind='barh', color='coral')
-    plt.xlabel('Average Data Value', fontsize=12)
-    plt.ylabel('State', fontsize=12)
-    plt.title('Average Health Indicators by State (Top 20)', 
-             fontsize=14, fontweight='bold', pad=20)
+if has_location and has_data_value:
+    print("\n2. Health Indicators by State (Top 20)")
     
-    # Add value labels
-    for i, v in enumerate(state_avg.values):
-        ax.text(v + max(state_avg.values)*0.01, i, f'{v:.1f}', 
-               va='center', fontsize=9)
-    
-    plt.tight_layout()
-    plt.savefig('visualizations/health_by_state.png', dpi=300, bbox_inches='tight')
-    print("  ✓ Saved: visualizations/health_by_state.png")
-    plt.close()
+    # Was a lazy Polars query; kept in pandas because the render workers are
+    # forked below. Arrow's pool (started by read_parquet) is reset after fork;
+    # a Polars pool is not and can deadlock
+    state_avg = (nutrition_valid.groupby('locationdesc', observed=True, sort=False)['data_value']
+                 .mean().nlargest(20))
+    plot_jobs.append((plot_health_by_state, (state_avg,)))
 
 # ============================================================
 # VISUALIZATION 3: CLASS/TOPIC ANALYSIS
 # ============================================================
 
-if 'class' in nutrition_df.columns:
-    print("\n3. Health Categories Distribution:")
-    
-    class_counts = nutrition_df['class'].value_counts()
+# Category counts are shared by the pie/bar charts, the category trends and
+# the box plot, so count them once
+if has_class:
+    # Count the integer category codes directly (-1 marks missing values)
+    class_codes = nutrition_df['class'].cat.codes.to_numpy()
+    class_categories = nutrition_df['class'].cat.categories
+    code_counts = np.bincount(class_codes[class_codes >= 0], minlength=len(class_categories))
     
-    # Create pie chart
-    plt.figure(figsize=(12, 8))
-    colors = sns.color_palette("husl", len(class_counts))
-    plt.pie(class_counts.values, labels=class_counts.index, autopct='%1.1f%%',
-            startangle=90, colors=colors, textprops={'fontsize': 10})
-    plt.title('Distribution of Health Categories', fontsize=14, fontweight='bold', pad=20)
-    plt.tight_layout()
-    plt.savefig('visualizations/health_categories_pie.png', dpi=300, bbox_inches='tight')
-    print("  ✓ Saved: visualizations/health_categories_pie.png")
-    plt.close()
-    
-    # Bar chart version
-    plt.figure(figsize=(14, 6))
-    ax = class_counts.plot(kind='bar', color='mediumseagreen')
-    plt.xlabel('Health Category', fontsize=12)
-    plt.ylabel('Number of Records', fontsize=12)
-    plt.title('Health Categories - Record Count', fontsize=14, fontweight='bold', pad=20)
-    plt.xticks(rotation=45, ha='right')
+    # Top 5 by partial selection; only those five are put in order
+    top_codes = np.flatnonzero(code_counts)
+    if len(top_codes) > 5:
+        top_codes = top_codes[np.argpartition(-code_counts[top_codes], 5)[:5]]
+    top_codes = top_codes[np.argsort(-code_counts[top_codes], kind='stable')]
+    top_classes = class_categories[top_codes]
     
-    # Add value labels
-    for i, v in enumerate(class_counts.values):
-        ax.text(i, v + max(class_counts.values)*0.01, f'{v:,}', 
-               ha='center', fontsize=10)
+    # Full ordered counts for the pie/bar charts
+    class_counts = pd.Series(code_counts, index=class_categories, name='count')
+    class_counts = class_counts[class_counts > 0].sort_values(ascending=False, kind='stable')
     
-    plt.tight_layout()
-    plt.savefig('visualizations/health_categories_bar.png', dpi=300, bbox_inches='tight')
-    print("  ✓ Saved: visualizations/health_categories_bar.png")
-    plt.close()
+    print("\n3. Health Categories Distribution")
+    plot_jobs.append((plot_health_categories, (class_counts,)))
 
 # ============================================================
 # VISUALIZATION 4: TIME SERIES
 # ============================================================
 
-if 'yearstart' in nutrition_df.columns and 'data_value' in nutrition_df.columns:
-    print("\n4. Health Trends Over Time:")
+if has_year and has_data_value:
+    print("\n4. Health Trends Over Time")
     
-    # Overall trend
-    yearly_data = nutrition_df.groupby('yearstart').agg({
-        'data_value': ['mean', 'median', 'std']
-    }).reset_index()
-    yearly_data.columns = ['year', 'mean', 'median', 'std']
+    # Overall trend: sort the values by year once, then reduce each
+    # contiguous year segment with NumPy
+    years = nutrition_valid['yearstart'].to_numpy()
+    values = nutrition_valid['data_value'].to_numpy(dtype=float)
+    order = np.argsort(years, kind='stable')
+    years, values = years[order], values[order]
     
-    plt.figure(figsize=(14, 6))
-    plt.plot(yearly_data['year'], yearly_data['mean'], marker='o', 
-            linewidth=2.5, markersize=8, label='Mean', color='steelblue')
-    plt.plot(yearly_data['year'], yearly_data['median'], marker='s', 
-            linewidth=2.5, markersize=8, label='Median', color='coral')
+    year_keys, starts = np.unique(years, return_index=True)
+    counts = np.diff(np.append(starts, len(years)))
+    means = np.add.reduceat(values, starts) / counts
+    # Sample standard deviation (ddof=1), NaN for single-record years
+    sq_dev = np.add.reduceat((values - np.repeat(means, counts)) ** 2, starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stds = np.sqrt(sq_dev / (counts - 1))
+    medians = [np.median(group) for group in np.split(values, starts[1:])]
     
-    # Add confidence interval
-    plt.fill_between(yearly_data['year'], 
-                     yearly_data['mean'] - yearly_data['std'],
-                     yearly_data['mean'] + yearly_data['std'],
-                     alpha=0.2, color='steelblue', label='±1 Std Dev')
-    
-    plt.xlabel('Year', fontsize=12)
-    plt.ylabel('Health Indicator Value', fontsize=12)
-    plt.title('Health Indicators Trends Over Time', fontsize=14, fontweight='bold', pad=20)
-    plt.legend(fontsize=11)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('visualizations/health_trends_time_series.png', dpi=300, bbox_inches='tight')
-    print("  ✓ Saved: visualizations/health_trends_time_series.png")
-    plt.close()
+    yearly_data = pd.DataFrame({'year': year_keys, 'mean': means,
+                                'median': medians, 'std': stds})
+    plot_jobs.append((plot_health_trends, (yearly_data,)))
     
     # By category over time
-    if 'class' in nutrition_df.columns:
-        print("\n5. Health Trends by Category:")
-        
-        category_time = nutrition_df.groupby(['yearstart', 'class'])['data_value'].mean().reset_index()
-        top_categories = nutrition_df['class'].value_counts().head(5).index
+    if has_class:
+        print("\n5. Health Trends by Category")
         
-        plt.figure(figsize=(14, 8))
-        for category in top_categories:
-            cat_data = category_time[category_time['class'] == category]
-            plt.plot(cat_data['yearstart'], cat_data['data_value'], 
-                    marker='o', linewidth=2, markersize=6, label=category)
+        # observed=True: only (year, class) pairs that exist; sort=False skips the
+        # group-key sort, the small result is ordered by year for the lines instead
+        category_time = (nutrition_valid.groupby(['yearstart', 'class'], observed=True, sort=False)['data_value']
+                         .mean().reset_index().sort_values('yearstart'))
         
-        plt.xlabel('Year', fontsize=12)
-        plt.ylabel('Average Value', fontsize=12)
-        plt.title('Health Trends by Category Over Time', fontsize=14, fontweight='bold', pad=20)
-        plt.legend(fontsize=10, loc='best')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        plt.savefig('visualizations/health_trends_by_category.png', dpi=300, bbox_inches='tight')
-        print("  ✓ Saved: visualizations/health_trends_by_category.png")
-        plt.close()
+        # Split the aggregated frame by category once instead of masking it per line
+        category_groups = dict(list(category_time.groupby('class', sort=False, observed=True)))
+        category_lines = {category: category_groups[category] for category in top_classes
+                          if category in category_groups}
+        plot_jobs.append((plot_category_trends, (category_lines,)))
 
 # ============================================================
 # VISUALIZATION 5: DISTRIBUTION PLOTS
 # ============================================================
 
-if 'data_value' in nutrition_df.columns:
-    print("\n6. Data Value Distribution:")
+if has_data_value:
+    print("\n6. Data Value Distribution")
     
-    fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    box_data = None
+    box_labels = None
+    if has_class:
+        # One value array per top category, straight from the groupby
+        class_values = {c: group.to_numpy() for c, group
+                        in nutrition_valid.groupby('class', observed=True)['data_value']}
+        box_labels = [c for c in top_classes if c in class_values]
+        box_data = [class_values[c] for c in box_labels]
     
-    # Histogram
-    axes[0].hist(nutrition_df['data_value'].dropna(), bins=50, 
-                color='steelblue', edgecolor='black', alpha=0.7)
-    axes[0].set_xlabel('Data Value', fontsize=12)
-    axes[0].set_ylabel('Frequency', fontsize=12)
-    axes[0].set_title('Distribution of Health Indicator Values', 
-                     fontsize=13, fontweight='bold')
-    axes[0].grid(True, alpha=0.3)
-    
-    # Box plot by class
-    if 'class' in nutrition_df.columns:
-        top_classes = nutrition_df['class'].value_counts().head(5).index
-        data_for_box = nutrition_df[nutrition_df['class'].isin(top_classes)]
-        
-        data_for_box.boxplot(column='data_value', by='class', ax=axes[1])
-        axes[1].set_xlabel('Health Category', fontsize=12)
-        axes[1].set_ylabel('Data Value', fontsize=12)
-        axes[1].set_title('Value Distribution by Category', 
-                         fontsize=13, fontweight='bold')
-        plt.sca(axes[1])
-        plt.xticks(rotation=45, ha='right')
-    
-    plt.suptitle('')  # Remove default title
-    plt.tight_layout()
-    plt.savefig('visualizations/data_value_distributions.png', dpi=300, bbox_inches='tight')
-    print("  ✓ Saved: visualizations/data_value_distributions.png")
-    plt.close()
+    # Bin the values up front so only the 50 counts go to the plot worker
+    hist_counts, hist_edges = np.histogram(nutrition_valid['data_value'].to_numpy(), bins=50)
+    plot_jobs.append((plot_value_distributions,
+                      (hist_counts, hist_edges, box_data, box_labels)))
 
 # ============================================================
 # VISUALIZATION 6: SAMPLE SIZE ANALYSIS
 # ============================================================
 
-if 'sample_size' in nutrition_df.columns and 'data_value' in nutrition_df.columns:
-    print("\n7. Sample Size vs Data Value:")
+if has_sample_size and has_data_value:
+    print("\n7. Sample Size vs Data Value")
     
-    plt.figure(figsize=(12, 6))
-    plt.scatter(nutrition_df['sample_size'], nutrition_df['data_value'], 
-               alpha=0.5, s=30, color='mediumseagreen')
-    plt.xlabel('Sample Size', fontsize=12)
-    plt.ylabel('Data Value', fontsize=12)
-    plt.title('Relationship between Sample Size and Data Value', 
-             fontsize=14, fontweight='bold', pad=20)
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('visualizations/sample_size_vs_value.png', dpi=300, bbox_inches='tight')
-    print("  ✓ Saved: visualizations/sample_size_vs_value.png")
-    plt.close()
+    scatter_df = nutrition_df
+    if len(scatter_df) > SCATTER_MAX_POINTS:
+        scatter_df = scatter_df.sample(SCATTER_MAX_POINTS, random_state=0)
+    plot_jobs.append((plot_sample_size_vs_value,
+                      (scatter_df['sample_size'].to_numpy(), scatter_df['data_value'].to_numpy())))
+
+# ============================================================
+# RENDER FIGURES
+# ============================================================
+
+print("\n" + "="*60)
+print(f"Rendering {len(plot_jobs)} figures...")
+print("="*60)
+
+# The figures are independent and CPU-bound (drawing + PNG encoding), so render
+# them in parallel. Forked workers inherit the imports and plot functions and
+# only receive the small aggregated inputs. Arrow's thread pool, already started
+# by read_parquet, is re-created in each child after fork. Spawned workers would re-run this
+# whole script on import, so without fork (e.g. on Windows) render in-process.
+if plot_jobs and 'fork' in multiprocessing.get_all_start_methods():
+    with ProcessPoolExecutor(max_workers=min(len(plot_jobs), os.cpu_count() or 1),
+                             mp_context=multiprocessing.get_context('fork')) as executor:
+        futures = [executor.submit(plot_func, *args) for plot_func, args in plot_jobs]
+        saved_paths = [future.result() for future in futures]
+else:
+    saved_paths = [plot_func(*args) for plot_func, args in plot_jobs]
+
+for path in saved_paths:
+    print(f"  ✓ Saved: {path}")
 
 # ============================================================
 # SUMMARY
@@ -297,6 +409,3 @@ print("  1. Review all charts in 'visualizations/' folder")
 print("  2. Include these in your project report")
 print("  3. Optional: Create Streamlit dashboard for interactivity")
 
-# Close connection
-client.close()
-print("\n✓ MongoDB connection closed.")